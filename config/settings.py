@@ -21,7 +21,7 @@ class Settings:
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
-    RELOAD: bool = os.getenv("RELOAD", "True").lower() == "true"
+    RELOAD: bool = os.getenv("RELOAD", "False").lower() == "true"  # Development only
     
     # LLM Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -34,6 +34,9 @@ class Settings:
     MAX_FILE_SIZE_PDF: int = 50 * 1024 * 1024  # 50MB
     MAX_FILE_SIZE_JSON: int = 10 * 1024 * 1024  # 10MB
     MAX_CONCURRENT_CHAPTERS: int = int(os.getenv("MAX_CONCURRENT_CHAPTERS", "3"))
+    USE_LLM_MERGE: bool = os.getenv("USE_LLM_MERGE", "False").lower() == "true"
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+    TEMP_DIR: str = os.getenv("TEMP_DIR", "temp_uploads")
     
     # Text Processing Configuration
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "4000"))
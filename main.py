@@ -3,14 +3,15 @@ LangChain PDF Knowledge Extraction Server
 Main FastAPI application entry point
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import AsyncExitStack, asynccontextmanager
 import json
 import logging
 from typing import Dict, Any
-import aiofiles
 import os
+import tempfile
 from datetime import datetime
 
 from services.pdf_processor import PDFProcessor
@@ -18,7 +19,9 @@ from services.langchain_service import LangChainService
 from services.knowledge_extractor import KnowledgeExtractor
 from models.schemas import ProcessResponse, ErrorResponse
 from utils.file_validator import FileValidator
-from utils.json_processor import JSONProcessor
+from utils.multipart_stream import MultipartStream
+from utils import async_fs
+from config.settings import settings
 
 # Configure logging
 logging.basicConfig(
@@ -27,11 +30,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared services and the upload directory once per application"""
+    os.makedirs(settings.TEMP_DIR, exist_ok=True)
+    app.state.temp_dir = settings.TEMP_DIR
+    
+    # Initialize services
+    app.state.pdf_processor = PDFProcessor()
+    app.state.pdf_processor.start()
+    app.state.langchain_service = LangChainService()
+    app.state.knowledge_extractor = KnowledgeExtractor(app.state.langchain_service)
+    app.state.file_validator = FileValidator()
+    
+    yield
+    
+    app.state.pdf_processor.shutdown()
+    await app.state.langchain_service.aclose()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LangChain PDF Knowledge Extraction API",
     description="Extract and structure knowledge points from course PDFs using LangChain",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -43,74 +65,127 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-pdf_processor = PDFProcessor()
-langchain_service = LangChainService()
-knowledge_extractor = KnowledgeExtractor(langchain_service)
-file_validator = FileValidator()
-json_processor = JSONProcessor()
+def get_pdf_processor(request: Request) -> PDFProcessor:
+    """Provide the shared PDF processor"""
+    return request.app.state.pdf_processor
+
+def get_knowledge_extractor(request: Request) -> KnowledgeExtractor:
+    """Provide the shared knowledge extractor"""
+    return request.app.state.knowledge_extractor
+
+def get_file_validator(request: Request) -> FileValidator:
+    """Provide the shared file validator"""
+    return request.app.state.file_validator
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "LangChain PDF Knowledge Extraction API", "status": "running"}
 
-@app.post("/process", response_model=ProcessResponse)
+# Multipart request body documented for the OpenAPI schema, since /process
+# reads the raw request stream instead of declaring File() parameters
+PROCESS_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["pdf_file", "json_file"],
+                    "properties": {
+                        "pdf_file": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "Course PDF file"
+                        },
+                        "json_file": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "Knowledge structure JSON file"
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+@app.post("/process", response_model=ProcessResponse, openapi_extra=PROCESS_REQUEST_BODY)
 async def process_files(
-    pdf_file: UploadFile = File(..., description="Course PDF file"),
-    json_file: UploadFile = File(..., description="Knowledge structure JSON file")
+    request: Request,
+    pdf_processor: PDFProcessor = Depends(get_pdf_processor),
+    knowledge_extractor: KnowledgeExtractor = Depends(get_knowledge_extractor),
+    file_validator: FileValidator = Depends(get_file_validator)
 ):
     """
     Process PDF and JSON files to extract structured knowledge points
     
+    The multipart body is parsed incrementally from request.stream(), so the
+    PDF is validated and written to disk chunk by chunk instead of being
+    buffered in memory first.
+    
     Args:
-        pdf_file: Course content in PDF format
-        json_file: Predefined knowledge structure in JSON format
+        request: Multipart request with pdf_file (course content in PDF format)
+            and json_file (predefined knowledge structure in JSON format) parts
+        pdf_processor: Shared PDF processor
+        knowledge_extractor: Shared knowledge extractor
+        file_validator: Shared file validator
     
     Returns:
         ProcessResponse: Structured knowledge points following input JSON format
     """
+    pdf_path = None
+    
     try:
-        # Validate uploaded files
-        logger.info(f"Processing files - PDF: {pdf_file.filename}, JSON: {json_file.filename}")
-        
-        await file_validator.validate_pdf(pdf_file)
-        await file_validator.validate_json(json_file)
+        pdf_filename = None
+        pdf_size = 0
+        json_filename = None
+        json_content = bytearray()
         
-        # Save uploaded files temporarily
-        temp_dir = "temp_uploads"
-        os.makedirs(temp_dir, exist_ok=True)
+        # Stream the PDF part straight to disk, validating as it arrives
+        file_validator.validate_content_length(request.headers.get("content-length"))
+        upload = MultipartStream(request.headers.get("content-type", ""))
+        async with AsyncExitStack() as stack:
+            async for field_name, filename, chunk in upload.parts(request.stream()):
+                if field_name == "pdf_file":
+                    if pdf_path is None:
+                        file_validator.validate_pdf(filename)
+                        pdf_filename = filename
+                        
+                        # Let the OS pick the name so the client filename never
+                        # becomes part of a filesystem path
+                        fd, pdf_path = tempfile.mkstemp(suffix=".pdf", dir=request.app.state.temp_dir)
+                        os.close(fd)
+                        pdf_out = await stack.enter_async_context(async_fs.open(pdf_path, 'wb'))
+                    
+                    pdf_size = file_validator.validate_pdf_chunk(chunk, pdf_size)
+                    await pdf_out.write(chunk)
+                
+                elif field_name == "json_file":
+                    json_filename = filename
+                    json_content += chunk
+                    file_validator.validate_json_size(len(json_content))
         
-        pdf_path = f"{temp_dir}/{pdf_file.filename}"
-        json_path = f"{temp_dir}/{json_file.filename}"
+        if pdf_path is None or json_filename is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Both pdf_file and json_file uploads are required"
+            )
         
-        # Save PDF file
-        async with aiofiles.open(pdf_path, 'wb') as f:
-            content = await pdf_file.read()
-            await f.write(content)
+        logger.info(f"Processing files - PDF: {pdf_filename}, JSON: {json_filename}")
         
-        # Save and parse JSON file
-        async with aiofiles.open(json_path, 'wb') as f:
-            json_content = await json_file.read()
-            await f.write(json_content)
-        
-        # Parse JSON structure
-        knowledge_structure = await json_processor.parse_json_file(json_path)
+        # Parse JSON structure straight from the validated upload buffer
+        knowledge_structure = await file_validator.validate_json(json_filename, bytes(json_content))
         logger.info("Successfully parsed knowledge structure JSON")
         
-        # Extract PDF content by chapters
-        pdf_chapters = await pdf_processor.extract_chapters(pdf_path)
-        logger.info(f"Extracted {len(pdf_chapters)} chapters from PDF")
+        # Extract PDF content by chapters, consumed lazily by the extractor
+        pdf_chapters = pdf_processor.extract_chapters(pdf_path)
         
         # Process each chapter with LangChain
         structured_knowledge = await knowledge_extractor.extract_knowledge_points(
             pdf_chapters, knowledge_structure
         )
         
-        # Cleanup temporary files
-        os.remove(pdf_path)
-        os.remove(json_path)
-        
         logger.info("Successfully processed files and extracted knowledge points")
         
         return ProcessResponse(
@@ -120,18 +195,19 @@ async def process_files(
             processed_at=datetime.now().isoformat()
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing files: {str(e)}")
         
-        # Cleanup on error
-        for file_path in [pdf_path, json_path]:
-            if 'file_path' in locals() and os.path.exists(file_path):
-                os.remove(file_path)
-        
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process files: {str(e)}"
         )
+    
+    finally:
+        # Cleanup temporary PDF file
+        await async_fs.remove(pdf_path)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -148,4 +224,14 @@ async def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    
+    # The reloader is for development only; without it uvicorn runs on
+    # uvloop and httptools when they are installed (uvicorn[standard])
+    uvicorn.run(
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        reload=settings.RELOAD,
+        loop="auto",
+        http="auto"
+    )
\ No newline at end of file
@@ -4,8 +4,9 @@ Data validation and response models
 """
 
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
+import msgspec
 
 class ProcessResponse(BaseModel):
     """Response model for successful processing"""
@@ -40,4 +41,16 @@ class KnowledgeStructure(BaseModel):
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+        }
+
+# Value of a structure indicator field: a nested template or a placeholder
+IndicatorValue = Union[List[Any], Dict[str, Any], str]
+
+class KnowledgeStructureSchema(msgspec.Struct, kw_only=True):
+    """Typed schema for decoding and validating a knowledge structure in one pass"""
+    topics: Optional[IndicatorValue] = None
+    concepts: Optional[IndicatorValue] = None
+    knowledge_points: Optional[IndicatorValue] = None
+    learning_objectives: Optional[IndicatorValue] = None
+    content: Optional[IndicatorValue] = None
+    sections: Optional[IndicatorValue] = None
@@ -3,9 +3,15 @@ Knowledge Extraction Service
 Orchestrates the complete knowledge extraction process
 """
 
+import hashlib
 import logging
-from typing import List, Dict, Any
+import weakref
+import orjson
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Any, Tuple
 from services.langchain_service import LangChainService
+from utils.knowledge_merger import KnowledgeMerger
+from config.settings import settings
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -15,47 +21,65 @@ class KnowledgeExtractor:
     
     def __init__(self, langchain_service: LangChainService):
         self.langchain_service = langchain_service
-        self.max_concurrent_requests = 3  # Limit concurrent API calls
+        self.knowledge_merger = KnowledgeMerger()
+        self.max_concurrent_requests = settings.MAX_CONCURRENT_CHAPTERS  # Limit concurrent API calls
+        
+        # Shared by every request so the limit applies to the process as a
+        # whole rather than per upload
+        self.semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        self.use_llm_merge = settings.USE_LLM_MERGE  # Opt-in LLM merge for messy outputs
+        
+        # LRU cache of chapter results keyed by (content hash, structure hash),
+        # shared across requests so repeated content skips the LLM call
+        self.chapter_cache_size = 1024
+        self._chapter_cache: OrderedDict[Tuple[str, str], Dict[str, Any]] = OrderedDict()
+        self._chapter_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
     
     async def extract_knowledge_points(
         self, 
-        chapters: List[Dict[str, str]], 
+        chapters: AsyncIterator[Dict[str, str]], 
         knowledge_structure: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Extract knowledge points from all chapters and structure them
         
         Args:
-            chapters: List of chapter dictionaries with content
+            chapters: Async iterator of chapter dictionaries with content
             knowledge_structure: Target JSON structure for knowledge points
             
         Returns:
             Complete structured knowledge points
         """
         try:
-            logger.info(f"Starting knowledge extraction for {len(chapters)} chapters")
+            logger.info("Starting knowledge extraction")
             
-            # Create semaphore to limit concurrent requests
-            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            # Serialize the target structure once for every chapter prompt
+            structure_json = orjson.dumps(knowledge_structure, option=orjson.OPT_INDENT_2).decode()
+            structure_key = self._content_hash(structure_json)
             
-            # Process chapters concurrently with rate limiting
-            tasks = []
-            for chapter in chapters:
-                task = self._process_chapter_with_semaphore(
-                    semaphore, chapter, knowledge_structure
-                )
-                tasks.append(task)
+            # Pipeline chapters from the PDF producer to a fixed set of consumers,
+            # so the first LLM request goes out as soon as chapter 1 is ready
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_requests * 2)
+            chapter_results: List[Tuple[int, Dict[str, Any]]] = []
             
-            # Execute all chapter processing tasks
-            chapter_results = await asyncio.gather(*tasks, return_exceptions=True)
+            # The task group cancels chapters in flight if the PDF cannot be
+            # split; per-chapter LLM failures are logged by the consumers
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    task_group.create_task(self._produce_chapters(
+                        chapters, queue, self.max_concurrent_requests
+                    ))
+                    for _ in range(self.max_concurrent_requests):
+                        task_group.create_task(self._consume_chapters(
+                            queue, structure_json, structure_key, chapter_results
+                        ))
+            except* Exception as eg:
+                # Surface the original error rather than the exception group
+                raise eg.exceptions[0]
             
-            # Filter successful results and log errors
-            successful_results = []
-            for i, result in enumerate(chapter_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to process chapter {i + 1}: {str(result)}")
-                else:
-                    successful_results.append(result)
+            # Restore document order for the merge
+            chapter_results.sort(key=lambda item: item[0])
+            successful_results = [result for _, result in chapter_results]
             
             if not successful_results:
                 raise Exception("Failed to process any chapters successfully")
@@ -63,9 +87,14 @@ class KnowledgeExtractor:
             logger.info(f"Successfully processed {len(successful_results)} chapters")
             
             # Merge all chapter results into final structure
-            final_knowledge = await self.langchain_service.merge_knowledge_points(
-                successful_results, knowledge_structure
-            )
+            if self.use_llm_merge:
+                final_knowledge = await self.langchain_service.merge_knowledge_points(
+                    successful_results, structure_json
+                )
+            else:
+                final_knowledge = self.knowledge_merger.merge(
+                    successful_results, knowledge_structure
+                )
             
             return final_knowledge
             
@@ -73,40 +102,119 @@ class KnowledgeExtractor:
             logger.error(f"Error in knowledge extraction process: {str(e)}")
             raise
     
+    async def _produce_chapters(
+        self, 
+        chapters: AsyncIterator[Dict[str, str]], 
+        queue: asyncio.Queue, 
+        consumer_count: int
+    ) -> None:
+        """
+        Feed chapters into the processing queue as the PDF is split
+        
+        Args:
+            chapters: Async iterator of chapter dictionaries with content
+            queue: Bounded queue shared with the chapter consumers
+            consumer_count: Number of consumers to signal once all chapters are queued
+        """
+        async for chapter in chapters:
+            await queue.put(chapter)
+        
+        for _ in range(consumer_count):
+            await queue.put(None)
+    
+    async def _consume_chapters(
+        self, 
+        queue: asyncio.Queue, 
+        structure_json: str, 
+        structure_key: str, 
+        chapter_results: List[Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """
+        Process queued chapters until the producer signals the end
+        
+        Args:
+            queue: Bounded queue filled by the chapter producer
+            structure_json: Serialized target JSON structure
+            structure_key: Content hash of the serialized structure
+            chapter_results: Collected (chapter number, result) pairs
+        """
+        while (chapter := await queue.get()) is not None:
+            try:
+                result = await self._process_chapter_with_semaphore(
+                    chapter, structure_json, structure_key
+                )
+                chapter_results.append((chapter['chapter_number'], result))
+            except Exception as e:
+                logger.error(f"Failed to process chapter {chapter['chapter_number']}: {str(e)}")
+    
     async def _process_chapter_with_semaphore(
         self, 
-        semaphore: asyncio.Semaphore, 
         chapter: Dict[str, str], 
-        knowledge_structure: Dict[str, Any]
+        structure_json: str, 
+        structure_key: str
     ) -> Dict[str, Any]:
         """
         Process a single chapter with concurrency control
         
+        Chapters whose content was already extracted against the same
+        structure reuse the cached result instead of calling the LLM again.
+        
         Args:
-            semaphore: Asyncio semaphore for rate limiting
             chapter: Chapter dictionary with content
-            knowledge_structure: Target JSON structure
+            structure_json: Serialized target JSON structure
+            structure_key: Content hash of the serialized structure
             
         Returns:
             Extracted knowledge points for the chapter
         """
-        async with semaphore:
-            try:
-                logger.info(f"Processing chapter: {chapter['title']}")
-                
-                result = await self.langchain_service.extract_knowledge_from_chapter(
-                    chapter['content'], knowledge_structure
-                )
-                
-                # Add chapter metadata to result
-                result['_chapter_info'] = {
-                    "chapter_number": chapter['chapter_number'],
-                    "title": chapter['title']
-                }
-                
-                logger.info(f"Completed processing chapter: {chapter['title']}")
-                return result
+        cache_key = (self._content_hash(chapter['content']), structure_key)
+        
+        # Serialize identical chapters so duplicates wait for the first result
+        lock = self._chapter_locks.get(cache_key)
+        if lock is None:
+            lock = self._chapter_locks[cache_key] = asyncio.Lock()
+        
+        async with lock:
+            result = self._chapter_cache.get(cache_key)
+            if result is not None:
+                self._chapter_cache.move_to_end(cache_key)
+                logger.info(f"Reusing knowledge points for duplicate chapter: {chapter['title']}")
+            else:
+                async with self.semaphore:
+                    try:
+                        logger.info(f"Processing chapter: {chapter['title']}")
+                        
+                        result = await self.langchain_service.extract_knowledge_from_chapter(
+                            chapter['content'], structure_json
+                        )
+                        
+                        logger.info(f"Completed processing chapter: {chapter['title']}")
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing chapter {chapter['title']}: {str(e)}")
+                        raise
                 
-            except Exception as e:
-                logger.error(f"Error processing chapter {chapter['title']}: {str(e)}")
-                raise
\ No newline at end of file
+                self._chapter_cache[cache_key] = result
+                if len(self._chapter_cache) > self.chapter_cache_size:
+                    self._chapter_cache.popitem(last=False)
+        
+        # Add chapter metadata to a copy so cached results stay untouched
+        result = dict(result)
+        result['_chapter_info'] = {
+            "chapter_number": chapter['chapter_number'],
+            "title": chapter['title']
+        }
+        
+        return result
+    
+    def _content_hash(self, content: str) -> str:
+        """
+        Hash text content for chapter result caching
+        
+        Args:
+            content: Text to hash
+            
+        Returns:
+            Hex digest of the content
+        """
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
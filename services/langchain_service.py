@@ -3,17 +3,17 @@ LangChain Service
 Handles LLM interactions and prompt management
 """
 
+import json
 import logging
-import os
+import httpx
+import orjson
 from typing import Dict, Any, List
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import LangChainException
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +22,27 @@ class LangChainService:
     
     def __init__(self):
         """Initialize LangChain service with LLM configuration"""
+        # Long completions send nothing until done, so only connection setup
+        # gets a short timeout
+        timeout = httpx.Timeout(300.0, connect=10.0)
+        
+        # Shared HTTP/2 client so concurrent chapter requests are multiplexed
+        # over pooled connections instead of each paying TCP + TLS setup
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=timeout
+        )
+        
         # Configure LLM - supports OpenAI API compatible endpoints
         self.llm = ChatOpenAI(
-            model="deepseek-chat",  # Can be changed to gpt-4 or other models
-            openai_api_base=os.getenv("OPENAI_API_BASE", "https://api.deepseek.com"),
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-            temperature=0.1,  # Low temperature for consistent outputs
-            max_tokens=4000
+            model=settings.LLM_MODEL,  # Can be changed to gpt-4 or other models
+            openai_api_base=settings.OPENAI_API_BASE,
+            openai_api_key=settings.OPENAI_API_KEY,
+            temperature=settings.LLM_TEMPERATURE,  # Low temperature for consistent outputs
+            max_tokens=settings.LLM_MAX_TOKENS,
+            timeout=timeout,  # Sent with every request, overriding the client default
+            http_async_client=self.http_client
         )
         
         # JSON output parser for structured responses
@@ -63,20 +77,44 @@ JSON STRUCTURE TEMPLATE:
 Extract the knowledge points from the chapter content and fill the JSON template accordingly. Return ONLY the filled JSON structure, no additional text or explanations.""")
         ])
         
-        # Create the processing chain
+        # Knowledge merge prompt template
+        self.merge_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert at consolidating educational content. Your task is to merge multiple knowledge point extractions into a single, comprehensive JSON structure.
+
+INSTRUCTIONS:
+1. Combine all knowledge points from different chapters
+2. Eliminate duplicates while preserving unique information
+3. Organize content logically within the target structure
+4. Ensure comprehensive coverage of all topics
+5. Maintain the exact JSON structure provided
+6. Return ONLY the merged JSON, no additional text"""),
+            
+            ("human", """Please merge the following extracted knowledge points into the target JSON structure:
+
+EXTRACTED KNOWLEDGE POINTS:
+{extracted_points}
+
+TARGET JSON STRUCTURE:
+{target_structure}
+
+Merge all knowledge points into a comprehensive, well-organized JSON structure.""")
+        ])
+        
+        # Create the processing and merge chains once, reused by every request
         self.processing_chain = self.knowledge_prompt | self.llm | self.json_parser
+        self.merge_chain = self.merge_prompt | self.llm | self.json_parser
     
     async def extract_knowledge_from_chapter(
         self, 
         chapter_content: str, 
-        json_structure: Dict[str, Any]
+        json_structure: str
     ) -> Dict[str, Any]:
         """
         Extract knowledge points from a chapter using LangChain
         
         Args:
             chapter_content: Text content of the chapter
-            json_structure: Target JSON structure for knowledge points
+            json_structure: Target JSON structure for knowledge points, already serialized
             
         Returns:
             Structured knowledge points in JSON format
@@ -87,7 +125,7 @@ Extract the knowledge points from the chapter content and fill the JSON template
             # Prepare inputs for the chain
             inputs = {
                 "chapter_content": chapter_content,
-                "json_structure": json.dumps(json_structure, indent=2, ensure_ascii=False)
+                "json_structure": json_structure
             }
             
             # Process with LangChain
@@ -106,14 +144,14 @@ Extract the knowledge points from the chapter content and fill the JSON template
     async def merge_knowledge_points(
         self, 
         extracted_points: List[Dict[str, Any]], 
-        target_structure: Dict[str, Any]
+        target_structure: str
     ) -> Dict[str, Any]:
         """
         Merge multiple extracted knowledge points into final structure
         
         Args:
             extracted_points: List of extracted knowledge from different chapters
-            target_structure: Target JSON structure
+            target_structure: Target JSON structure, already serialized
             
         Returns:
             Merged and structured knowledge points
@@ -121,40 +159,26 @@ Extract the knowledge points from the chapter content and fill the JSON template
         try:
             logger.info("Starting knowledge points merge")
             
-            merge_prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are an expert at consolidating educational content. Your task is to merge multiple knowledge point extractions into a single, comprehensive JSON structure.
-
-INSTRUCTIONS:
-1. Combine all knowledge points from different chapters
-2. Eliminate duplicates while preserving unique information
-3. Organize content logically within the target structure
-4. Ensure comprehensive coverage of all topics
-5. Maintain the exact JSON structure provided
-6. Return ONLY the merged JSON, no additional text"""),
-                
-                ("human", """Please merge the following extracted knowledge points into the target JSON structure:
-
-EXTRACTED KNOWLEDGE POINTS:
-{extracted_points}
-
-TARGET JSON STRUCTURE:
-{target_structure}
-
-Merge all knowledge points into a comprehensive, well-organized JSON structure.""")
-            ])
-            
-            merge_chain = merge_prompt | self.llm | self.json_parser
+            try:
+                points_json = orjson.dumps(extracted_points, option=orjson.OPT_INDENT_2).decode()
+            except TypeError:
+                # orjson rejects integers beyond 64 bits, which LLM output can contain
+                points_json = json.dumps(extracted_points, indent=2, ensure_ascii=False)
             
             inputs = {
-                "extracted_points": json.dumps(extracted_points, indent=2, ensure_ascii=False),
-                "target_structure": json.dumps(target_structure, indent=2, ensure_ascii=False)
+                "extracted_points": points_json,
+                "target_structure": target_structure
             }
             
-            result = await merge_chain.ainvoke(inputs)
+            result = await self.merge_chain.ainvoke(inputs)
             
             logger.info("Successfully merged knowledge points")
             return result
             
         except Exception as e:
             logger.error(f"Error merging knowledge points: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        await self.http_client.aclose()
@@ -3,148 +3,194 @@ PDF Processing Service
 Handles PDF file loading, text extraction, and chapter segmentation
 """
 
+import asyncio
 import logging
-from typing import List, Dict
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import re
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+import pypdfium2 as pdfium
+
+from config.settings import settings
+from utils.text_segmenter import split_into_chapters, split_into_chunks
 
 logger = logging.getLogger(__name__)
 
+# Smallest page range handed to a single extraction worker
+MIN_PAGES_PER_WORKER = 8
+
+def _count_pages(pdf_path: str) -> int:
+    """
+    Count the pages of a PDF file (runs in an extraction worker process)
+    
+    Args:
+        pdf_path: Path to the PDF file
+        
+    Returns:
+        Number of pages
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def _extract_page_texts(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of a page range (runs in an extraction worker process)
+    
+    PDFium is not thread-safe, so every PDFium call is made from a
+    single-threaded worker process that opens its own document handle.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        start: Index of the first page to extract
+        stop: Index after the last page to extract
+        
+    Returns:
+        Text of each page in the range
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_texts = []
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return page_texts
+    finally:
+        pdf.close()
+
 class PDFProcessor:
     """Service for processing PDF files and extracting content"""
     
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=4000,
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        self.chunk_size = settings.CHUNK_SIZE
+        self.chunk_overlap = settings.CHUNK_OVERLAP
+        if self.chunk_overlap >= self.chunk_size:
+            # Each chunk would advance by a single character, multiplying LLM calls
+            raise ValueError(
+                f"CHUNK_OVERLAP ({self.chunk_overlap}) must be smaller than "
+                f"CHUNK_SIZE ({self.chunk_size})"
+            )
+        self.max_workers = settings.PDF_EXTRACT_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
     
-    async def extract_chapters(self, pdf_path: str) -> List[Dict[str, str]]:
+    async def extract_chapters(self, pdf_path: str) -> AsyncIterator[Dict[str, str]]:
         """
         Extract chapters from PDF file
         
+        Chapters are yielded as they are produced so callers can start
+        processing the first chapters while the rest are still being split.
+        
         Args:
             pdf_path: Path to the PDF file
             
-        Returns:
-            List of dictionaries containing chapter information
+        Yields:
+            Dictionaries containing chapter information
         """
         try:
             logger.info(f"Starting PDF extraction from: {pdf_path}")
             
-            # Load PDF using LangChain PyPDFLoader
-            loader = PyPDFLoader(pdf_path)
-            documents = loader.load()
+            # Extract page text with PDFium across the worker pool
+            page_texts = await self._extract_page_texts(pdf_path)
             
-            logger.info(f"Loaded {len(documents)} pages from PDF")
+            logger.info(f"Loaded {len(page_texts)} pages from PDF")
             
-            # Combine all pages content
-            full_text = "\n".join([doc.page_content for doc in documents])
+            # Combine all pages content, releasing the page texts before splitting
+            full_text = "\n".join(page_texts)
+            del page_texts
             
-            # Split into chapters using common patterns
-            chapters = self._split_into_chapters(full_text)
+            # Split into chapters using common patterns, off the event loop
+            chapters = await asyncio.to_thread(split_into_chapters, full_text)
             
             # If no clear chapters found, split by text chunks
             if len(chapters) <= 1:
                 chapters = self._split_by_chunks(full_text)
+            del full_text
+            
+            chapter_count = 0
+            for chapter in chapters:
+                chapter_count += 1
+                yield chapter
             
-            logger.info(f"Successfully extracted {len(chapters)} chapters")
-            return chapters
+            logger.info(f"Successfully extracted {chapter_count} chapters")
             
         except Exception as e:
             logger.error(f"Error extracting PDF chapters: {str(e)}")
             raise
     
-    def _split_into_chapters(self, text: str) -> List[Dict[str, str]]:
+    async def _extract_page_texts(self, pdf_path: str) -> List[str]:
         """
-        Split text into chapters based on common patterns
+        Extract the text of every page, splitting page ranges across worker processes
         
         Args:
-            text: Full text content
+            pdf_path: Path to the PDF file
             
         Returns:
-            List of chapter dictionaries
+            Text of each page in document order
         """
-        # Common chapter patterns
-        chapter_patterns = [
-            r'第[一二三四五六七八九十\d]+章.*?(?=第[一二三四五六七八九十\d]+章|$)',
-            r'Chapter\s+\d+.*?(?=Chapter\s+\d+|$)',
-            r'CHAPTER\s+\d+.*?(?=CHAPTER\s+\d+|$)',
-            r'\n\d+\..*?(?=\n\d+\.|$)',
-            r'\n[A-Z][^.]*\n.*?(?=\n[A-Z][^.]*\n|$)'
-        ]
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
         
-        chapters = []
+        page_count = await loop.run_in_executor(executor, _count_pages, pdf_path)
+        pages_per_worker = max(MIN_PAGES_PER_WORKER, math.ceil(page_count / self.max_workers))
         
-        for pattern in chapter_patterns:
-            matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
-            if matches and len(matches) > 1:
-                for i, match in enumerate(matches):
-                    chapter_title = self._extract_chapter_title(match)
-                    chapters.append({
-                        "chapter_number": i + 1,
-                        "title": chapter_title,
-                        "content": match.strip()
-                    })
-                break
+        futures = [
+            loop.run_in_executor(
+                executor, _extract_page_texts, pdf_path, start, min(start + pages_per_worker, page_count)
+            )
+            for start in range(0, page_count, pages_per_worker)
+        ]
         
-        # If no patterns matched, return whole text as single chapter
-        if not chapters:
-            chapters = [{
-                "chapter_number": 1,
-                "title": "Complete Document",
-                "content": text.strip()
-            }]
+        return [text for page_range in await asyncio.gather(*futures) for text in page_range]
+    
+    def start(self) -> None:
+        """
+        Create the PDF extraction worker pool
         
-        return chapters
+        Called once at application startup. Workers are started through a
+        forkserver, because forking the multi-threaded server process (event
+        loop helper threads, file I/O threads) can deadlock the children.
+        """
+        if self._executor is None:
+            mp_context = multiprocessing.get_context("forkserver")
+            # Import PDFium once in the fork server instead of in every worker
+            mp_context.set_forkserver_preload([__name__])
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context)
     
-    def _split_by_chunks(self, text: str) -> List[Dict[str, str]]:
+    def _get_executor(self) -> ProcessPoolExecutor:
         """
-        Split text into manageable chunks when no clear chapter structure exists
+        Get the PDF extraction worker pool, starting it if start() was not called
         
-        Args:
-            text: Full text content
-            
         Returns:
-            List of chunk dictionaries
+            Process pool shared by all extraction requests
         """
-        chunks = self.text_splitter.split_text(text)
-        
-        chapters = []
-        for i, chunk in enumerate(chunks):
-            chapters.append({
-                "chapter_number": i + 1,
-                "title": f"Section {i + 1}",
-                "content": chunk.strip()
-            })
-        
-        return chapters
+        if self._executor is None:
+            self.start()
+        return self._executor
     
-    def _extract_chapter_title(self, chapter_text: str) -> str:
+    def shutdown(self) -> None:
+        """Shut down the PDF extraction worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+    
+    def _split_by_chunks(self, text: str) -> Iterator[Dict[str, str]]:
         """
-        Extract chapter title from chapter text
+        Split text into manageable chunks when no clear chapter structure exists
         
         Args:
-            chapter_text: Text content of the chapter
+            text: Full text content
             
-        Returns:
-            Extracted chapter title
+        Yields:
+            Chunk dictionaries
         """
-        lines = chapter_text.strip().split('\n')
-        
-        # Try to find a clear title in the first few lines
-        for line in lines[:3]:
-            line = line.strip()
-            if line and len(line) < 100:  # Reasonable title length
-                return line
-        
-        # Fallback to first non-empty line
-        for line in lines:
-            line = line.strip()
-            if line:
-                return line[:100] + "..." if len(line) > 100 else line
-        
-        return "Untitled Chapter"
\ No newline at end of file
+        for i, chunk in enumerate(split_into_chunks(text, self.chunk_size, self.chunk_overlap)):
+            yield {
+                "chapter_number": i + 1,
+                "title": f"Section {i + 1}",
+                "content": chunk
+            }
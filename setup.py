@@ -0,0 +1,22 @@
+"""
+Optional native build of the hot pure-Python helpers
+
+The listed modules are compiled in place with mypyc; the application runs
+unchanged (as plain Python) when they are not built:
+
+    pip install mypy
+    python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="knowledge-extraction-api",
+    ext_modules=mypycify([
+        "--explicit-package-bases",
+        "utils/text_segmenter.py",
+        "utils/knowledge_merger.py",
+        "utils/json_clean.py",
+    ]),
+)
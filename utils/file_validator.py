@@ -4,106 +4,183 @@ Validates uploaded files for security and format compliance
 """
 
 import logging
-from fastapi import UploadFile, HTTPException
-import json
-import magic
+from fastapi import HTTPException
+from typing import Any, Dict, Optional
+import orjson
 import os
 
+from config.settings import settings
+
 logger = logging.getLogger(__name__)
 
+# File signatures matched against the first bytes of an upload
+PDF_SIGNATURE = b'%PDF-'
+UTF8_BOM = b'\xef\xbb\xbf'
+EXECUTABLE_SIGNATURES = (b'MZ', b'\x7fELF')  # PE/DOS and ELF binaries
+
 class FileValidator:
     """Utility class for validating uploaded files"""
     
     def __init__(self):
-        self.max_file_size = 50 * 1024 * 1024  # 50MB max file size
+        self.max_file_size = settings.MAX_FILE_SIZE_PDF
+        self.max_json_size = settings.MAX_FILE_SIZE_JSON
         self.allowed_pdf_types = ["application/pdf"]
         self.allowed_json_types = ["application/json", "text/plain"]
     
-    async def validate_pdf(self, pdf_file: UploadFile) -> None:
+    def validate_content_length(self, content_length: Optional[str]) -> None:
+        """
+        Reject requests whose declared body size exceeds the upload limits
+        
+        Checked before the body is read, so oversized uploads are refused
+        without streaming any of their content.
+        
+        Args:
+            content_length: Value of the request Content-Length header, if any
+            
+        Raises:
+            HTTPException: If the declared body is too large
+        """
+        if content_length is None or not content_length.isdigit():
+            return
+        
+        # Allow room for the multipart boundaries and part headers
+        max_request_size = self.max_file_size + self.max_json_size + 64 * 1024
+        if int(content_length) > max_request_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request too large. Maximum size: {max_request_size // (1024*1024)}MB"
+            )
+    
+    def validate_pdf(self, filename: Optional[str]) -> None:
         """
-        Validate PDF file upload
+        Validate PDF upload metadata before its content is streamed
         
         Args:
-            pdf_file: Uploaded PDF file
+            filename: Name of the uploaded PDF file
             
         Raises:
             HTTPException: If validation fails
         """
         # Check file extension
-        if not pdf_file.filename.lower().endswith('.pdf'):
+        if not filename or not filename.lower().endswith('.pdf'):
             raise HTTPException(
                 status_code=400,
                 detail="File must have .pdf extension"
             )
+    
+    def validate_pdf_chunk(self, chunk: bytes, received: int) -> int:
+        """
+        Validate the next chunk of a streamed PDF upload
         
-        # Check file size
-        file_content = await pdf_file.read()
-        if len(file_content) > self.max_file_size:
+        Args:
+            chunk: Next chunk of PDF content
+            received: Number of PDF bytes received before this chunk
+            
+        Returns:
+            Number of PDF bytes received including this chunk
+            
+        Raises:
+            HTTPException: If validation fails
+        """
+        # Validate PDF content type (basic check) on the first chunk
+        if received == 0:
+            self._reject_executable(chunk)
+            if not chunk.startswith(PDF_SIGNATURE):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid PDF file format"
+                )
+        
+        # Check file size as the upload streams in
+        received += len(chunk)
+        if received > self.max_file_size:
             raise HTTPException(
-                status_code=400,
+                status_code=413,
                 detail=f"PDF file too large. Maximum size: {self.max_file_size // (1024*1024)}MB"
             )
         
-        # Reset file pointer
-        await pdf_file.seek(0)
+        return received
+    
+    def validate_json_size(self, received: int) -> None:
+        """
+        Check the size of a streamed JSON upload
         
-        # Validate PDF content type (basic check)
-        if not file_content.startswith(b'%PDF'):
+        Args:
+            received: Number of JSON bytes received so far
+            
+        Raises:
+            HTTPException: If the JSON file is too large
+        """
+        if received > self.max_json_size:
             raise HTTPException(
-                status_code=400,
-                detail="Invalid PDF file format"
+                status_code=413,
+                detail=f"JSON file too large. Maximum size: {self.max_json_size // (1024*1024)}MB"
             )
-        
-        logger.info(f"PDF file validation successful: {pdf_file.filename}")
     
-    async def validate_json(self, json_file: UploadFile) -> None:
+    async def validate_json(self, filename: Optional[str], file_content: bytes) -> Dict[str, Any]:
         """
         Validate JSON file upload
         
         Args:
-            json_file: Uploaded JSON file
+            filename: Name of the uploaded JSON file
+            file_content: Content of the uploaded JSON file
+            
+        Returns:
+            Parsed JSON structure
             
         Raises:
             HTTPException: If validation fails
         """
         # Check file extension
-        if not json_file.filename.lower().endswith('.json'):
+        if not filename or not filename.lower().endswith('.json'):
             raise HTTPException(
                 status_code=400,
                 detail="File must have .json extension"
             )
         
         # Check file size
-        file_content = await json_file.read()
-        if len(file_content) > 10 * 1024 * 1024:  # 10MB for JSON
-            raise HTTPException(
-                status_code=400,
-                detail="JSON file too large. Maximum size: 10MB"
-            )
+        self.validate_json_size(len(file_content))
         
         # Validate JSON format
+        self._reject_executable(file_content)
+        
+        # Accept a leading UTF-8 BOM, which orjson would otherwise reject
+        json_bytes = memoryview(file_content)
+        if file_content.startswith(UTF8_BOM):
+            json_bytes = json_bytes[len(UTF8_BOM):]
+        
+        # orjson parses the raw bytes and rejects non-UTF-8 input itself
         try:
-            json_content = json.loads(file_content.decode('utf-8'))
+            json_content = orjson.loads(json_bytes)
             if not isinstance(json_content, dict):
                 raise HTTPException(
                     status_code=400,
                     detail="JSON file must contain a valid object structure"
                 )
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid JSON format: {str(e)}"
             )
-        except UnicodeDecodeError:
+        
+        logger.info(f"JSON file validation successful: {filename}")
+        return json_content
+    
+    def _reject_executable(self, header: bytes) -> None:
+        """
+        Reject uploads that start with an executable file signature
+        
+        Args:
+            header: Leading bytes of the uploaded file
+            
+        Raises:
+            HTTPException: If the upload is an executable
+        """
+        if header.startswith(EXECUTABLE_SIGNATURES):
             raise HTTPException(
                 status_code=400,
-                detail="JSON file must be UTF-8 encoded"
+                detail="Executable files are not allowed"
             )
-        
-        # Reset file pointer
-        await json_file.seek(0)
-        
-        logger.info(f"JSON file validation successful: {json_file.filename}")
     
     def validate_file_size(self, file_path: str, max_size: int) -> bool:
         """
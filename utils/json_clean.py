@@ -0,0 +1,125 @@
+"""
+JSON Cleaning Utilities
+Recursive walkers over parsed JSON values
+"""
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+def walk(obj: Any) -> Tuple[Any, bool]:
+    """
+    Clean non-serializable objects in a single pass with structural sharing
+
+    Containers are only copied when one of their children changed, so an
+    already serializable structure is returned as the very same object.
+    Tuples are converted to lists, matching how JSON encoders emit them.
+
+    Args:
+        obj: Object to clean
+
+    Returns:
+        Tuple of (cleaned object, whether anything was changed)
+    """
+    # Dispatch on the exact type with identity checks, which avoids the MRO
+    # walks of isinstance; subclasses and unknown types take the fallback
+    obj_type = type(obj)
+    if obj_type is str or obj_type is int or obj_type is float or obj_type is bool or obj is None:
+        return obj, False
+    elif obj_type is dict:
+        return _walk_dict(obj)
+    elif obj_type is list:
+        return _walk_list(obj)
+    return _walk_fallback(obj)
+
+def _walk_dict(obj: Dict[Any, Any]) -> Tuple[Any, bool]:
+    """
+    Clean the values of a dict, copying it only if a value changed
+
+    Args:
+        obj: Dict to clean
+
+    Returns:
+        Tuple of (cleaned object, whether anything was changed)
+    """
+    cleaned_dict: Optional[Dict[Any, Any]] = None
+    for key, value in obj.items():
+        cleaned_value, value_changed = walk(value)
+        if value_changed:
+            if cleaned_dict is None:
+                cleaned_dict = dict(obj)
+            cleaned_dict[key] = cleaned_value
+    if cleaned_dict is None:
+        return obj, False
+    return cleaned_dict, True
+
+def _walk_list(obj: Any) -> Tuple[Any, bool]:
+    """
+    Clean the items of a list, copying it only if an item changed
+
+    Args:
+        obj: List (or tuple) to clean
+
+    Returns:
+        Tuple of (cleaned object, whether anything was changed)
+    """
+    # Lists of a single JSON leaf type (e.g. embedding vectors) are already
+    # serializable, which one identity scan confirms without per-item walks
+    if obj:
+        first_type = type(obj[0])
+        if first_type is float or first_type is int or first_type is str or first_type is bool:
+            if all(type(item) is first_type for item in obj):
+                return obj, False
+
+    cleaned_list: Optional[List[Any]] = None
+    for index, item in enumerate(obj):
+        cleaned_item, item_changed = walk(item)
+        if item_changed:
+            if cleaned_list is None:
+                cleaned_list = list(obj)
+            cleaned_list[index] = cleaned_item
+    if cleaned_list is None:
+        return obj, False
+    return cleaned_list, True
+
+def _walk_tuple(obj: Any) -> Tuple[Any, bool]:
+    """
+    Clean the items of a tuple and convert it to a list
+
+    Args:
+        obj: Tuple to clean
+
+    Returns:
+        Tuple of (cleaned object, whether anything was changed)
+    """
+    cleaned, changed = _walk_list(obj)
+    return (cleaned if changed else list(obj)), True
+
+def _walk_fallback(obj: Any) -> Tuple[Any, bool]:
+    """
+    Clean values whose exact type is not a JSON type
+
+    Args:
+        obj: NumPy value, subclass of a JSON type, or any other object
+
+    Returns:
+        Tuple of (cleaned object, whether anything was changed)
+    """
+    # NumPy arrays and scalars convert to Python values in one C call; the
+    # module is only consulted if the application already imported it.
+    # Dtypes like datetime64, complex or object convert to values that are
+    # still not serializable, so the result is walked as well.
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(obj, (numpy.ndarray, numpy.generic)):
+        return walk(obj.tolist())[0], True
+
+    if isinstance(obj, dict):
+        return _walk_dict(obj)
+    elif isinstance(obj, list):
+        return _walk_list(obj)
+    elif isinstance(obj, tuple):
+        return _walk_tuple(obj)
+    elif isinstance(obj, (str, int, float, bool)):
+        return obj, False
+    else:
+        # Convert non-serializable objects to string
+        return str(obj), True
@@ -3,16 +3,70 @@ JSON Processing Utilities
 Handles JSON file operations and structure validation
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, Any
-import aiofiles
+import mmap
+import os
+import re
+from typing import AsyncIterator, Dict, Any, List, Tuple
+import ijson
+import msgspec
+import orjson
+
+try:
+    import simdjson
+except ImportError:  # pysimdjson is optional; parse_json_element falls back to orjson
+    simdjson = None
+
+from models.schemas import KnowledgeStructureSchema
+from utils import async_fs
+from utils.json_clean import walk
 
 logger = logging.getLogger(__name__)
 
+# Files at least this large are parsed from a read-only memory map
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+def _loads_mapped(json_path: str) -> Any:
+    """
+    Parse a JSON file straight from a read-only memory map
+    
+    orjson reads the page cache through the mapping, which skips copying
+    the whole file into a userspace buffer first.
+    
+    Args:
+        json_path: Path to the JSON file
+        
+    Returns:
+        Parsed JSON value
+    """
+    with open(json_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            return orjson.loads(view)
+
+# Container types walked during validation, including lazy simdjson elements
+_OBJECT_TYPES: Tuple[type, ...] = (dict,) + ((simdjson.Object,) if simdjson is not None else ())
+_ARRAY_TYPES: Tuple[type, ...] = (list,) + ((simdjson.Array,) if simdjson is not None else ())
+
 class JSONProcessor:
     """Utility class for JSON file processing and validation"""
     
+    # Keys that mark a usable knowledge structure (can be customized)
+    _INDICATORS = frozenset({
+        'topics', 'concepts', 'knowledge_points', 
+        'learning_objectives', 'content', 'sections'
+    })
+    
+    # All indicators in one pattern, so each key is scanned once for any of
+    # them; substring matches keep keys like "main_topics" valid
+    _INDICATOR_PATTERN = re.compile('|'.join(map(re.escape, sorted(_INDICATORS))))
+    
+    def __init__(self):
+        # Reused across calls so simdjson keeps its internal buffers
+        self._parser = simdjson.Parser() if simdjson is not None else None
+    
     async def parse_json_file(self, json_path: str) -> Dict[str, Any]:
         """
         Parse JSON file and return structure
@@ -24,92 +78,255 @@ class JSONProcessor:
             Parsed JSON structure
             
         Raises:
-            Exception: If JSON parsing fails
+            ValueError: If JSON parsing fails
         """
         try:
-            async with aiofiles.open(json_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                json_structure = json.loads(content)
+            size = await asyncio.to_thread(os.path.getsize, json_path)
+            
+            if size >= MMAP_THRESHOLD:
+                json_structure = await asyncio.to_thread(_loads_mapped, json_path)
+            else:
+                # Read raw bytes; orjson validates UTF-8 itself, so no decode pass is needed
+                content = await async_fs.read_bytes(json_path)
+                json_structure = orjson.loads(content)
             
             logger.info("Successfully parsed JSON structure file")
             return json_structure
             
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing error: {str(e)}")
-            raise Exception(f"Invalid JSON format: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error reading JSON file: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            logger.error("JSON parsing error: %s near %r", e, self._error_excerpt(e))
+            raise ValueError("Invalid JSON format") from e
+    
+    async def parse_json_element(self, json_path: str) -> Any:
+        """
+        Parse a JSON file into a lazy, read-only document for inspection
+        
+        With pysimdjson installed the shared parser returns a simdjson
+        element, which only converts the values that are accessed. Without
+        it, the file is fully parsed with orjson.
+        
+        Args:
+            json_path: Path to the JSON file
+            
+        Returns:
+            simdjson Object/Array (or plain Python value) for the document
+            
+        Raises:
+            ValueError: If JSON parsing fails
+        """
+        content = await async_fs.read_bytes(json_path)
+        
+        if self._parser is None:
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError as e:
+                logger.error("JSON parsing error: %s", e)
+                raise ValueError("Invalid JSON format") from e
+        
+        try:
+            try:
+                return self._parser.parse(content)
+            except RuntimeError:
+                # The shared parser is still referenced by a live element from
+                # an earlier call, so this document gets its own parser
+                return simdjson.Parser().parse(content)
+        except ValueError as e:
+            logger.error("JSON parsing error: %s", e)
+            raise ValueError("Invalid JSON format") from e
+    
+    async def parse_many(self, json_paths: List[str], max_io: int = 32) -> List[Any]:
+        """
+        Parse many JSON files concurrently
+        
+        Reads are bounded by a semaphore and overlap with each other; each
+        file is decoded as soon as its bytes arrive.
+        
+        Args:
+            json_paths: Paths to the JSON files
+            max_io: Maximum number of files read at once
+            
+        Returns:
+            Parsed JSON values in the order of json_paths
+            
+        Raises:
+            ValueError: If parsing any file fails
+        """
+        semaphore = asyncio.Semaphore(max_io)
+        
+        async def parse_one(json_path: str) -> Any:
+            async with semaphore:
+                content = await async_fs.read_bytes(json_path)
+            
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError as e:
+                logger.error("JSON parsing error in %s: %s", json_path, e)
+                raise ValueError(f"Invalid JSON format in {json_path}") from e
+        
+        results = await asyncio.gather(*(parse_one(json_path) for json_path in json_paths))
+        
+        logger.info("Successfully parsed %d JSON files", len(results))
+        return results
+    
+    async def parse_and_validate(self, json_path: str) -> KnowledgeStructureSchema:
+        """
+        Parse a JSON structure file and validate it against the typed schema
+        
+        Decoding and validation happen in a single msgspec pass. Only the
+        structure indicator fields are kept; use parse_json_file when the
+        full document is needed.
+        
+        Args:
+            json_path: Path to the JSON file
+            
+        Returns:
+            Decoded structure indicator fields
+            
+        Raises:
+            msgspec.ValidationError: If the structure does not match the schema
+            ValueError: If JSON parsing fails
+        """
+        try:
+            content = await async_fs.read_bytes(json_path)
+            structure = msgspec.json.decode(content, type=KnowledgeStructureSchema)
+            
+            if all(getattr(structure, field) is None for field in structure.__struct_fields__):
+                raise msgspec.ValidationError("JSON structure contains no knowledge structure indicators")
+            
+            logger.info("Successfully parsed and validated JSON structure file")
+            return structure
+            
+        except msgspec.ValidationError:
             raise
+        except msgspec.DecodeError as e:
+            logger.error("JSON parsing error: %s", e)
+            raise ValueError("Invalid JSON format") from e
+    
+    def _error_excerpt(self, error: orjson.JSONDecodeError, radius: int = 40) -> str:
+        """
+        Slice the text around a parse error for logging
+        
+        orjson attaches the decoded document to the error, so the excerpt is
+        cut from it directly instead of decoding or re-reading the file.
+        
+        Args:
+            error: Decode error raised by orjson
+            radius: Number of characters to keep on each side of the error
+            
+        Returns:
+            Excerpt of the offending line around the error position
+        """
+        doc, pos = error.doc, error.pos
+        
+        # Stay on the offending line, but never scan past the window
+        start = max(doc.rfind('\n', max(0, pos - radius), pos) + 1, pos - radius, 0)
+        end = doc.find('\n', pos, pos + radius)
+        if end == -1:
+            end = pos + radius
+        
+        return doc[start:end]
+    
+    async def parse_json_file_streaming(self, json_path: str, prefix: str = '') -> AsyncIterator[Any]:
+        """
+        Stream-parse a JSON file, materializing only the values under a prefix
+        
+        Meant for large structure files where only a subtree is needed; the
+        file is read in chunks and parsed incrementally, so the full document
+        is never held in memory.
+        
+        Args:
+            json_path: Path to the JSON file
+            prefix: ijson prefix of the values to yield, e.g. 'topics.item'
+                for each topic, or '' for the whole document
+            
+        Yields:
+            Parsed values found under the prefix
+            
+        Raises:
+            ValueError: If JSON parsing fails
+        """
+        try:
+            async with async_fs.open(json_path, 'rb') as f:
+                async for item in ijson.items_async(f, prefix, use_float=True):
+                    yield item
+            
+            logger.info("Successfully stream-parsed JSON structure file: %s", prefix or '<root>')
+            
+        except ijson.JSONError as e:
+            logger.error("JSON parsing error: %s", e)
+            raise ValueError("Invalid JSON format") from e
     
-    def validate_json_structure(self, json_data: Dict[str, Any]) -> bool:
+    def validate_json_structure(self, json_data: Any, assume_valid: bool = False) -> bool:
         """
         Validate JSON structure for knowledge extraction
         
+        Structures returned by parse_and_validate were already checked
+        against the schema and are accepted without another walk.
+        
         Args:
-            json_data: JSON data to validate
+            json_data: JSON data to validate, either a parsed dict, a lazy
+                element from parse_json_element or a KnowledgeStructureSchema
+            assume_valid: Skip validation for data the caller already validated
             
         Returns:
             True if structure is valid
         """
+        if assume_valid or isinstance(json_data, KnowledgeStructureSchema):
+            return True
+        
         try:
             # Basic structure validation
-            if not isinstance(json_data, dict):
+            if not isinstance(json_data, _OBJECT_TYPES):
                 return False
             
-            # Check for common required fields (can be customized)
-            required_structure_indicators = [
-                'topics', 'concepts', 'knowledge_points', 
-                'learning_objectives', 'content', 'sections'
-            ]
-            
-            # Check if at least one structure indicator exists
-            has_valid_structure = any(
-                key in str(json_data).lower() 
-                for key in required_structure_indicators
-            )
-            
-            return has_valid_structure
+            # Check if at least one structure indicator key exists
+            return self._has_indicator(json_data)
             
         except Exception as e:
-            logger.error(f"JSON structure validation error: {str(e)}")
+            logger.error("JSON structure validation error: %s", e)
             return False
     
-    def ensure_json_serializable(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _has_indicator(self, obj: Any) -> bool:
         """
-        Ensure data is JSON serializable
+        Check whether any dict key in a JSON value contains a structure indicator
+        
+        Walks the structure with an explicit stack, so deeply nested input
+        cannot hit the recursion limit, and stops at the first match.
         
         Args:
-            data: Data to check and clean
+            obj: JSON value to scan
             
         Returns:
-            JSON serializable data
+            True if an indicator key is found
         """
-        try:
-            # Test serialization
-            json.dumps(data, ensure_ascii=False)
-            return data
-        except (TypeError, ValueError) as e:
-            logger.warning(f"Data serialization issue: {str(e)}")
-            
-            # Clean non-serializable data
-            return self._clean_non_serializable(data)
+        stack = [obj]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, _OBJECT_TYPES):
+                for key, value in node.items():
+                    if isinstance(key, str) and self._INDICATOR_PATTERN.search(key.lower()):
+                        return True
+                    if isinstance(value, _OBJECT_TYPES + _ARRAY_TYPES):
+                        stack.append(value)
+            elif isinstance(node, _ARRAY_TYPES):
+                stack.extend(item for item in node if isinstance(item, _OBJECT_TYPES + _ARRAY_TYPES))
+        
+        return False
     
-    def _clean_non_serializable(self, obj: Any) -> Any:
+    def ensure_json_serializable(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Recursively clean non-serializable objects
+        Ensure data is JSON serializable
+        
+        Detection and cleaning happen in one pass; data that is already
+        serializable is returned unchanged without being copied.
         
         Args:
-            obj: Object to clean
+            data: Data to check and clean
             
         Returns:
-            Cleaned object
-        """
-        if isinstance(obj, dict):
-            return {k: self._clean_non_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._clean_non_serializable(item) for item in obj]
-        elif isinstance(obj, (str, int, float, bool)) or obj is None:
-            return obj
-        else:
-            # Convert non-serializable objects to string
-            return str(obj)
\ No newline at end of file
+            JSON serializable data
+        """
+        cleaned, changed = walk(data)
+        if changed:
+            logger.warning("Data serialization issue: replaced non-serializable values with strings")
+        return cleaned
@@ -0,0 +1,105 @@
+"""
+Knowledge Merging Utilities
+Deterministically merges per-chapter extraction results into the target structure
+"""
+
+import json
+import logging
+from typing import Any, Dict, List
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class KnowledgeMerger:
+    """Utility class for merging chapter knowledge points without an LLM round-trip"""
+
+    def merge(
+        self,
+        extracted_points: List[Dict[str, Any]],
+        target_structure: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Merge multiple extracted knowledge points into the target structure
+
+        The target structure is walked as a template: objects are merged key
+        by key, lists from all chapters are concatenated with duplicates
+        removed, and scalars take the first non-empty chapter value, or null
+        when no chapter supplied one.
+
+        Args:
+            extracted_points: List of extracted knowledge from different chapters
+            target_structure: Target JSON structure
+
+        Returns:
+            Merged and structured knowledge points
+        """
+        merged = self._merge_value(target_structure, extracted_points)
+        logger.info(f"Merged knowledge points from {len(extracted_points)} chapters")
+        return merged
+
+    def _merge_value(self, template: Any, values: List[Any]) -> Any:
+        """
+        Merge chapter values for a single position in the template
+
+        Args:
+            template: Template value at this position
+            values: Values found at the same position in each chapter result
+
+        Returns:
+            Merged value
+        """
+        if isinstance(template, dict):
+            return {
+                key: self._merge_value(
+                    template_value,
+                    [value[key] for value in values if isinstance(value, dict) and key in value]
+                )
+                for key, template_value in template.items()
+            }
+
+        if isinstance(template, list):
+            items: Dict[bytes, Any] = {}
+            for value in values:
+                for item in (value if isinstance(value, list) else [value]):
+                    if not self._is_empty(item):
+                        items.setdefault(self._dedupe_key(item), item)
+            return list(items.values())
+
+        for value in values:
+            if not self._is_empty(value):
+                return value
+
+        # The template value is placeholder text, not content from the document
+        return None
+
+    def _dedupe_key(self, item: Any) -> bytes:
+        """
+        Build a canonical key for detecting duplicate list items
+
+        Args:
+            item: List item from a chapter result
+
+        Returns:
+            Serialized item with sorted keys
+        """
+        try:
+            return orjson.dumps(item, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # orjson rejects integers beyond 64 bits, which LLM output can contain
+            return json.dumps(item, sort_keys=True, ensure_ascii=False).encode()
+
+    def _is_empty(self, value: Any) -> bool:
+        """
+        Check whether a value carries no extracted content
+
+        Args:
+            value: Value to check
+
+        Returns:
+            True if the value and all of its children are null or empty
+        """
+        if isinstance(value, dict):
+            return all(self._is_empty(item) for item in value.values())
+        if isinstance(value, list):
+            return all(self._is_empty(item) for item in value)
+        return value is None or value == ""
@@ -0,0 +1,187 @@
+"""
+Multipart Streaming Utilities
+Incrementally parses multipart/form-data request bodies without buffering uploads
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from fastapi import HTTPException
+
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+class MultipartStream:
+    """Incremental multipart/form-data parser that yields part data in fixed-size chunks"""
+
+    def __init__(self, content_type: str, chunk_size: int = 64 * 1024):
+        """
+        Initialize the parser from the request Content-Type header
+
+        Args:
+            content_type: Value of the request Content-Type header
+            chunk_size: Size of the chunks yielded for each part
+
+        Raises:
+            HTTPException: If the request is not multipart/form-data
+        """
+        media_type, params = parse_options_header(content_type)
+        if media_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=400,
+                detail="Request must be multipart/form-data"
+            )
+
+        self.chunk_size = chunk_size
+        self._events: List[Tuple[str, Any]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    async def parts(
+        self,
+        stream: AsyncIterator[bytes]
+    ) -> AsyncIterator[Tuple[str, Optional[str], bytes]]:
+        """
+        Parse the request body stream part by part
+
+        Network chunks are coalesced so every part is yielded in blocks of
+        chunk_size bytes (the last block may be shorter). Each part yields at
+        least one block, which is empty for an empty upload.
+
+        Args:
+            stream: Request body stream, e.g. request.stream()
+
+        Yields:
+            Tuples of (field name, filename, data chunk)
+
+        Raises:
+            HTTPException: If the body is malformed, ends inside a part, or
+                repeats a field name
+        """
+        field_name = ""
+        filename: Optional[str] = None
+        buffer = bytearray()
+        yielded = False
+        in_part = False
+        seen_fields: Set[str] = set()
+
+        try:
+            async for body_chunk in stream:
+                self._parser.write(body_chunk)
+
+                events, self._events = self._events, []
+                for event, data in events:
+                    if event == "begin":
+                        field_name, filename = data
+                        if field_name in seen_fields:
+                            raise HTTPException(
+                                status_code=400,
+                                detail=f"Duplicate multipart field: {field_name}"
+                            )
+                        seen_fields.add(field_name)
+                        in_part = True
+                        buffer.clear()
+                        yielded = False
+                    elif event == "data":
+                        buffer += data
+                        while len(buffer) >= self.chunk_size:
+                            yield field_name, filename, bytes(buffer[:self.chunk_size])
+                            del buffer[:self.chunk_size]
+                            yielded = True
+                    elif event == "end":
+                        if buffer or not yielded:
+                            yield field_name, filename, bytes(buffer)
+                        buffer.clear()
+                        in_part = False
+
+            self._parser.finalize()
+        except MultipartParseError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Malformed multipart body: {e}"
+            ) from e
+
+        # The stream ended before the closing boundary of the current part
+        if in_part:
+            raise HTTPException(
+                status_code=400,
+                detail="Incomplete multipart body"
+            )
+
+    def _parse_content_disposition(self) -> Tuple[str, Optional[str]]:
+        """
+        Extract field name and filename from the current part headers
+
+        Returns:
+            Tuple of (field name, filename or None)
+        """
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+
+        field_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+
+        return field_name, filename.decode("utf-8", errors="replace") if filename is not None else None
+
+    def _on_part_begin(self) -> None:
+        """Reset the header map for a new part"""
+        self._headers = {}
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        """
+        Queue a slice of part data for the current part
+
+        Args:
+            data: Buffer passed to the parser
+            start: Index of the first byte belonging to this callback
+            end: Index after the last byte belonging to this callback
+        """
+        self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self) -> None:
+        """Queue the end of the current part"""
+        self._events.append(("end", b""))
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        """
+        Accumulate the name of the current part header
+
+        Args:
+            data: Buffer passed to the parser
+            start: Index of the first byte belonging to this callback
+            end: Index after the last byte belonging to this callback
+        """
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        """
+        Accumulate the value of the current part header
+
+        Args:
+            data: Buffer passed to the parser
+            start: Index of the first byte belonging to this callback
+            end: Index after the last byte belonging to this callback
+        """
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        """Store the completed header, keyed by its lowercased name"""
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        """Queue the start of a part with its field name and filename"""
+        self._events.append(("begin", self._parse_content_disposition()))
@@ -0,0 +1,130 @@
+"""
+Text Segmentation Utilities
+Pure string helpers for splitting extracted PDF text into chapters
+"""
+
+import re
+from typing import Any, Dict, Iterator, List
+
+# Chapter header anchors, tried in order. Chapters run from one header to the
+# next, so each pattern needs a single linear scan instead of a lazy
+# ".*?(?=header|$)" match per chapter.
+CHAPTER_PATTERNS: List[re.Pattern] = [
+    re.compile(r'第[一二三四五六七八九十\d]+章'),
+    re.compile(r'Chapter\s+\d+', re.IGNORECASE),
+    re.compile(r'\n\d+\.'),
+    re.compile(r'\n[A-Z][^.\n]*\n', re.IGNORECASE)
+]
+
+MAX_TITLE_LENGTH = 100  # Reasonable title length
+
+# Preferred cut points for fixed-size chunks, strongest first
+CHUNK_SEPARATORS: List[str] = ["\n\n", "\n", " "]
+
+def split_into_chapters(text: str) -> List[Dict[str, Any]]:
+    """
+    Split text into chapters based on common patterns
+
+    Args:
+        text: Full text content
+
+    Returns:
+        List of chapter dictionaries
+    """
+    chapters: List[Dict[str, Any]] = []
+
+    for pattern in CHAPTER_PATTERNS:
+        starts: List[int] = [match.start() for match in pattern.finditer(text)]
+        if len(starts) > 1:
+            starts.append(len(text))
+            for i in range(len(starts) - 1):
+                chapter_text = text[starts[i]:starts[i + 1]]
+                chapters.append({
+                    "chapter_number": i + 1,
+                    "title": extract_chapter_title(chapter_text),
+                    "content": chapter_text.strip()
+                })
+            break
+
+    # If no patterns matched, return whole text as single chapter
+    if not chapters:
+        chapters = [{
+            "chapter_number": 1,
+            "title": "Complete Document",
+            "content": text.strip()
+        }]
+
+    return chapters
+
+def extract_chapter_title(chapter_text: str) -> str:
+    """
+    Extract chapter title from chapter text
+
+    Args:
+        chapter_text: Text content of the chapter
+
+    Returns:
+        Extracted chapter title
+    """
+    lines = chapter_text.strip().split('\n')
+
+    # Try to find a clear title in the first few lines
+    for line in lines[:3]:
+        line = line.strip()
+        if line and len(line) < MAX_TITLE_LENGTH:
+            return line
+
+    # Fallback to first non-empty line
+    for line in lines:
+        line = line.strip()
+        if line:
+            return line[:MAX_TITLE_LENGTH] + "..." if len(line) > MAX_TITLE_LENGTH else line
+
+    return "Untitled Chapter"
+
+def split_into_chunks(text: str, chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    """
+    Split text into chunks of at most chunk_size characters in one linear pass
+
+    Each chunk is cut after the last paragraph break, line break or space
+    in the second half of its window, falling back to a hard cut. Consecutive chunks share
+    up to chunk_overlap characters, starting on a word boundary where possible.
+
+    Args:
+        text: Full text content
+        chunk_size: Maximum chunk length in characters
+        chunk_overlap: Number of characters repeated from the previous chunk
+
+    Yields:
+        Non-empty, stripped chunks in document order
+    """
+    text_length = len(text)
+    start = 0
+
+    while start < text_length:
+        end = start + chunk_size
+        if end >= text_length:
+            end = text_length
+        else:
+            # Cut after the strongest separator in the back half of the
+            # window, so chunks never shrink below half of chunk_size
+            for separator in CHUNK_SEPARATORS:
+                cut = text.rfind(separator, start + chunk_size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            yield chunk
+
+        if end >= text_length:
+            break
+
+        # Step back for the overlap, but always make progress
+        next_start = max(end - chunk_overlap, start + 1)
+        if next_start < end:
+            boundary = text.find(" ", next_start, end)
+            if boundary != -1:
+                next_start = boundary + 1
+        start = next_start